@@ -1,23 +1,28 @@
 import os
-import re
+import hmac
+import json
 import requests
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+from flask_cors import CORS
 from werkzeug.utils import secure_filename
 
 # ML baseline
 from sklearn.pipeline import Pipeline
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
+import online_model
 
 from langdetect import detect
 from deep_translator import GoogleTranslator
 
-# Text extraction libraries
-import pytesseract
-from PIL import Image
-import speech_recognition as sr
-import moviepy.editor as mp
+# Text extraction
+import extractors
+from evidence import refine_evidence, distinct_reports
+from query_builder import build_queries
+import verdict_rules
 
 load_dotenv()
 
@@ -35,24 +40,13 @@ SEARCH_ENGINE_ID = os.getenv("SEARCH_ENGINE_ID", "")
 app = Flask(__name__, template_folder="templates")
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max
+CORS(app, resources={r"/api/verify/*": {"origins": "*"}})  # React frontend runs on its own origin
 
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 # Training data
-fake_samples = [
-    "Free 5000 rupees from government to all citizens, click here",
-    "Breaking: actor died due to vaccine within hours share now",
-    "WhatsApp will charge 5 rupees per message tomorrow forward to 10 people",
-    "Modi giving free laptops to students register now",
-    "NASA confirms sun rose from west today shocking"
-]
-real_samples = [
-    "Government announces scholarship program for engineering students",
-    "ISRO successfully launches PSLV mission from Sriharikota",
-    "New traffic rules notified by Ministry of Road Transport",
-    "University releases exam timetable for the semester",
-    "RBI keeps repo rate unchanged in latest policy"
-]
+fake_samples = online_model.fake_samples
+real_samples = online_model.real_samples
 texts = fake_samples + real_samples
 labels = ["fake"] * len(fake_samples) + ["real"] * len(real_samples)
 
@@ -62,6 +56,12 @@ model = Pipeline([
 ])
 model.fit(texts, labels)
 
+# Indicator lists for decide_verdict (verdict_rules.json), compiled once
+rules = verdict_rules.load_rules()
+
+# Streaming model trained by online_model.py; takes over from the seed model once it exists on disk
+online = online_model.OnlineModel()
+
 # Helper functions
 def safe_detect_lang(text):
     try:
@@ -69,61 +69,18 @@ def safe_detect_lang(text):
     except Exception:
         return "en"
 
-def translate_text(text, target="en"):
+def translate_text(text, target="en", strict=False):
     try:
         if not text.strip():
             return text
         return GoogleTranslator(source="auto", target=target).translate(text)
     except Exception:
+        if strict:
+            raise
         return text
 
-def normalize_query(text):
-    text = re.sub(r"\s+", " ", text).strip()
-    return text[:300]
-
-# Text extraction functions
-def extract_text_from_image(file_path):
-    try:
-        image = Image.open(file_path)
-        text = pytesseract.image_to_string(image)
-        return text.strip()
-    except Exception as e:
-        return f"Error extracting text from image: {str(e)}"
-
-def extract_text_from_audio(file_path):
-    try:
-        r = sr.Recognizer()
-        audio_clip = mp.AudioFileClip(file_path)
-        temp_wav = file_path + ".wav"
-        audio_clip.write_audiofile(temp_wav, logger=None)
-        audio_clip.close()
-        
-        with sr.AudioFile(temp_wav) as source:
-            audio = r.record(source)
-        text = r.recognize_google(audio)
-        
-        if os.path.exists(temp_wav):
-            os.remove(temp_wav)
-        return text
-    except Exception as e:
-        return f"Error extracting text from audio: {str(e)}"
-
-def extract_text_from_video(file_path):
-    try:
-        video = mp.VideoFileClip(file_path)
-        audio = video.audio
-        temp_audio = file_path + ".wav"
-        audio.write_audiofile(temp_audio, logger=None)
-        audio.close()
-        video.close()
-        
-        text = extract_text_from_audio(temp_audio)
-        
-        if os.path.exists(temp_audio):
-            os.remove(temp_audio)
-        return text
-    except Exception as e:
-        return f"Error extracting text from video: {str(e)}"
+# Text extraction: content-sniffed backends run in killable subprocesses with per-type limits
+extractor_registry = extractors.default_registry()
 
 def process_uploaded_file(file):
     if not file or file.filename == '':
@@ -134,42 +91,64 @@ def process_uploaded_file(file):
     file.save(file_path)
     
     try:
-        file_ext = filename.lower().split('.')[-1]
-        
-        if file_ext in ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff']:
-            extracted_text = extract_text_from_image(file_path)
-        elif file_ext in ['mp3', 'wav', 'flac', 'm4a', 'aac']:
-            extracted_text = extract_text_from_audio(file_path)
-        elif file_ext in ['mp4', 'avi', 'mov', 'mkv', 'flv']:
-            extracted_text = extract_text_from_video(file_path)
-        elif file_ext in ['txt']:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                extracted_text = f.read()
-        else:
-            extracted_text = f"Unsupported file format: {file_ext}"
-        
-        os.remove(file_path)
-        return extracted_text
-        
+        extracted_text = extractor_registry.extract(file_path)
     except Exception as e:
+        extracted_text = f"Error processing file: {str(e)}"
+    finally:
         if os.path.exists(file_path):
             os.remove(file_path)
-        return f"Error processing file: {str(e)}"
+    return extracted_text
 
 # Enhanced evidence providers with AI
-def search_newsapi_ai(query):
-    """AI-powered news search with real-time data"""
+@lru_cache(maxsize=1024)
+def _fetch_newsapi_ai_concept(label):
+    # Raises on HTTP/network errors so that only real answers (a URI or "no match") get cached
+    url = "https://newsapi.ai/api/v1/suggestConceptsFast"
+    params = {"prefix": label, "lang": "eng", "apiKey": NEWSAPI_AI_KEY}
+    r = requests.get(url, params=params, timeout=5)
+    r.raise_for_status()
+    for concept in r.json() or []:
+        if concept.get("uri"):
+            return concept["uri"]
+    return None
+
+def lookup_newsapi_ai_concept(label, strict=False):
+    """Resolve an entity name to a newsapi.ai concept URI (None if it has no match or the lookup failed)"""
+    try:
+        return _fetch_newsapi_ai_concept(label)
+    except Exception:
+        if strict:
+            raise
+        return None
+
+def search_newsapi_ai(query, strict=False):
+    """AI-powered news search with real-time data.
+
+    `query` is the newsapi_ai entry from build_queries: entities are resolved to concepts
+    (unless the caller already did and passed "concept_uris"), falling back to a keyword
+    search when none of them resolve.
+    """
     if not NEWSAPI_AI_KEY:
         return []
+    if isinstance(query, str):
+        query = {"entities": [], "keywords": query}
+    
+    concept_uris = query.get("concept_uris")
+    if concept_uris is None:
+        concept_uris = [uri for uri in (lookup_newsapi_ai_concept(entity, strict) for entity in query.get("entities", [])) if uri]
+    if concept_uris:
+        terms = [{'conceptUri': uri} for uri in concept_uris[:2]]
+    else:
+        # one term per keyword: a single multi-word keyword is matched as an exact phrase
+        terms = [{'keyword': kw, 'keywordLoc': 'body'} for kw in query.get("keywords", "").split()]
+    if not terms:
+        return []
     
     url = "https://newsapi.ai/api/v1/article/getArticles"
     payload = {
         'query': {
             '$query': {
-                '$and': [
-                    {'conceptUri': f'http://en.wikipedia.org/wiki/{query.replace(" ", "_")}'},
-                    {'lang': 'eng'}
-                ]
+                '$and': terms + [{'lang': 'eng'}]
             },
             '$filter': {
                 'forceMaxDataTimeWindow': 7
@@ -201,11 +180,14 @@ def search_newsapi_ai(query):
                     "confidence": "high"
                 })
             return out
+        r.raise_for_status()
     except Exception:
+        if strict:
+            raise
         return []
     return []
 
-def search_newsdata_io(query):
+def search_newsdata_io(query, strict=False):
     """Real-time news from NewsData.io"""
     if not NEWSDATA_IO_KEY:
         return []
@@ -235,11 +217,14 @@ def search_newsdata_io(query):
                     "confidence": "high"
                 })
             return out
+        r.raise_for_status()
     except Exception:
+        if strict:
+            raise
         return []
     return []
 
-def search_factcheck_google(query):
+def search_factcheck_google(query, strict=False):
     """Google Fact Check Tools API"""
     if not FACTCHECK_API_KEY:
         return []
@@ -262,11 +247,13 @@ def search_factcheck_google(query):
                         "confidence": "very_high"
                     })
             return out
+        r.raise_for_status()
     except Exception:
-        pass
+        if strict:
+            raise
     return []
 
-def search_bing_web(query):
+def search_bing_web(query, strict=False):
     """Bing Web Search for additional verification"""
     if not BING_API_KEY:
         return []
@@ -289,9 +276,11 @@ def search_bing_web(query):
             })
         return results
     except Exception:
+        if strict:
+            raise
         return []
 
-def search_newsapi(query):
+def search_newsapi(query, strict=False):
     """Original NewsAPI for additional coverage"""
     if not NEWSAPI_KEY:
         return []
@@ -319,12 +308,14 @@ def search_newsapi(query):
                     "confidence": "medium"
                 })
             return out
+        r.raise_for_status()
     except Exception:
-        pass
+        if strict:
+            raise
     return []
 
 # New function for Google Custom Search
-def search_google_web(query):
+def search_google_web(query, strict=False):
     """Performs a Google web search for general verification."""
     if not GOOGLE_API_KEY or not SEARCH_ENGINE_ID:
         return []
@@ -354,6 +345,8 @@ def search_google_web(query):
             })
         return results
     except Exception as e:
+        if strict:
+            raise
         print(f"Google Search Error: {e}")
         return []
 
@@ -395,6 +388,12 @@ def is_fact_checker(url):
         return False
 
 def baseline_ml_label(text_en):
+    try:
+        prediction = online.predict(text_en)
+        if prediction:
+            return prediction
+    except Exception as e:
+        print(f"Online model error: {e}")
     try:
         proba = model.predict_proba([text_en])[0]
         classes = model.classes_
@@ -403,37 +402,48 @@ def baseline_ml_label(text_en):
     except Exception:
         return "real", 0.5
 
-# Updated function to include the call to Google Search
-def aggregate_evidence(query_en):
-    """Collect evidence from multiple AI-powered sources"""
-    evidence = []
-    
-    # Priority 1: Official fact-checks
-    fc = search_factcheck_google(query_en)
-    evidence.extend(fc)
-    
-    # Priority 2: AI-powered news sources
-    ai_news = search_newsapi_ai(query_en)
-    evidence.extend(ai_news)
-    
-    # Priority 3: Real-time news
-    realtime_news = search_newsdata_io(query_en)
-    evidence.extend(realtime_news)
-    
-    # Priority 4: Standard news APIs
-    regular_news = search_newsapi(query_en)
-    evidence.extend(regular_news)
+# Evidence providers in priority order; aggregate_evidence keeps this order in its output.
+# Each returns [] on any failure; pass strict=True to get the exception instead (batch_verify.py).
+EVIDENCE_PROVIDERS = [
+    ("factcheck", search_factcheck_google),   # Priority 1: Official fact-checks
+    ("newsapi_ai", search_newsapi_ai),        # Priority 2: AI-powered news sources
+    ("newsdata_io", search_newsdata_io),      # Priority 3: Real-time news
+    ("newsapi", search_newsapi),              # Priority 4: Standard news APIs
+    ("google_search", search_google_web),     # Google Custom Search
+    ("bing", search_bing_web),                # Priority 5: General web search
+]
 
-    # Added call to new Google Search function
-    google_results = search_google_web(query_en)
-    evidence.extend(google_results)
-    
-    # Priority 5: General web search
-    bing_results = search_bing_web(query_en)
-    evidence.extend(bing_results)
-    
+def iter_evidence(queries):
+    """Query all providers in parallel and yield (provider, results) as each one finishes.
+
+    `queries` maps provider name to its query, as returned by build_queries.
+    """
+    pool = ThreadPoolExecutor(max_workers=len(EVIDENCE_PROVIDERS))
+    try:
+        futures = {pool.submit(fn, queries[name]): name for name, fn in EVIDENCE_PROVIDERS}
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception:
+                results = []
+            yield futures[future], results
+    finally:
+        # If the consumer stops early (e.g. an SSE client disconnected) don't hold the
+        # worker until the slowest provider times out; running calls finish in the background.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def collect_evidence(results_by_provider):
+    evidence = []
+    for name, _ in EVIDENCE_PROVIDERS:
+        evidence.extend(results_by_provider.get(name, []))
     return evidence
 
+def aggregate_evidence(queries):
+    """Collect evidence from multiple AI-powered sources (claim text or build_queries output)"""
+    if isinstance(queries, str):
+        queries = build_queries(queries)
+    return collect_evidence(dict(iter_evidence(queries)))
+
 def decide_verdict(text_en, evidence):
     """Enhanced verdict logic with AI-powered sources"""
     # Categorize evidence by type and quality
@@ -446,20 +456,19 @@ def decide_verdict(text_en, evidence):
     
     # All news sources combined
     all_news = ai_news + realtime_news + regular_news + bing_results + google_results
-    trusted_sources = [e for e in all_news if is_trusted(e.get("url", ""))]
+    # one outlet's several articles on the same story count once
+    trusted_sources = distinct_reports(e for e in all_news if is_trusted(e.get("url", "")))
     fact_check_sources = [e for e in all_news if is_fact_checker(e.get("url", ""))]
+    text_hits = rules.scan(text_en)
     
     # Priority 1: Official fact-checks
     if fact_checks:
         ratings_text = " | ".join(f'{e.get("publisher","")}: {e.get("rating","")}' for e in fact_checks[:3])
-        rating_blob = " ".join((e.get("rating") or "").lower() for e in fact_checks)
+        rating_hits = rules.scan(" | ".join(e.get("rating") or "" for e in fact_checks))
         
-        true_indicators = ["true", "correct", "accurate", "verified", "legitimate"]
-        false_indicators = ["false", "fake", "incorrect", "debunked", "misleading", "fabricated"]
-        
-        if any(indicator in rating_blob for indicator in true_indicators):
+        if "rating_true" in rating_hits:
             return "Fact", f"✅ Official fact-checkers confirm this is TRUE. Sources: {ratings_text}"
-        if any(indicator in rating_blob for indicator in false_indicators):
+        if "rating_false" in rating_hits:
             return "Misconception", f"❌ Official fact-checkers confirm this is FALSE. Sources: {ratings_text}"
         return "Needs more proof", f"⚠️ Mixed fact-check results. Sources: {ratings_text}"
     
@@ -476,32 +485,28 @@ def decide_verdict(text_en, evidence):
             return "Fact", f"✅ Confirmed by {len(trusted_realtime)} trusted real-time news sources"
     
     # Priority 4: Multiple trusted sources
-    if len(trusted_sources) >= 3:
-        return "Fact", f"✅ Reported by {len(trusted_sources)} trusted news sources"
+    if trusted_sources >= 3:
+        return "Fact", f"✅ Reported by {trusted_sources} trusted news sources"
     
-    if len(trusted_sources) >= 2:
-        return "Fact", f"✅ Confirmed by {len(trusted_sources)} credible sources"
+    if trusted_sources >= 2:
+        return "Fact", f"✅ Confirmed by {trusted_sources} credible sources"
     
     # Priority 5: Fact-checker sources
     if len(fact_check_sources) >= 1:
         return "Fact", f"✅ Corroborated by fact-checking organizations"
     
     # Priority 6: Official content detection
-    official_indicators = ["supreme court", "election commission", "government announces", "ministry", 
-                           "rbi", "isro", "parliament", "lok sabha", "rajya sabha", "high court"]
-    if any(indicator in text_en.lower() for indicator in official_indicators):
+    if "official" in text_hits:
         if len(all_news) >= 3:
             return "Fact", f"✅ Official government/institutional news with widespread coverage ({len(all_news)} sources)"
-        elif len(trusted_sources) >= 1:
+        elif trusted_sources >= 1:
             return "Fact", f"✅ Official news confirmed by trusted sources"
     
     # Priority 7: Enhanced suspicious content detection
     lbl, conf = baseline_ml_label(text_en)
-    suspicious_keywords = ["free money", "forward to", "share now", "breaking:", "urgent", 
-                           "shocking", "died within hours", "whatsapp will charge", "click here"]
     
     if lbl == "fake" and conf >= 0.7:
-        if any(keyword in text_en.lower() for keyword in suspicious_keywords):
+        if "suspicious" in text_hits:
             return "Misconception", f"🚨 High suspicion: Contains typical misinformation patterns (AI confidence: {conf:.1%})"
     
     # Priority 8: Coverage analysis
@@ -509,10 +514,10 @@ def decide_verdict(text_en, evidence):
     if total_sources == 0:
         return "Needs more proof", "📊 No verification sources found online"
     
-    if len(trusted_sources) == 0 and total_sources >= 5:
+    if trusted_sources == 0 and total_sources >= 5:
         return "Needs more proof", f"⚠️ Found {total_sources} sources but none from verified outlets"
     
-    if len(all_news) >= 1 and len(trusted_sources) == 0:
+    if len(all_news) >= 1 and trusted_sources == 0:
         return "Needs more proof", f"⚠️ Limited verification - found {len(all_news)} sources but need trusted confirmation"
     
     return "Needs more proof", "⚠️ Insufficient evidence for confident verdict"
@@ -601,8 +606,8 @@ def home():
         src_lang = safe_detect_lang(raw_text)
         text_en = raw_text if src_lang.startswith("en") else translate_text(raw_text, "en")
 
-        query = normalize_query(text_en)
-        evidence = aggregate_evidence(query)
+        queries = build_queries(text_en)
+        evidence = refine_evidence(aggregate_evidence(queries))
         verdict, reason = decide_verdict(text_en, evidence)
 
         # Format results with enhanced display
@@ -617,6 +622,85 @@ def home():
 
     return render_template("index.html", result=None, original_text="", target_lang="auto")
 
+# Progressive results over Server-Sent Events
+def sse_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def stream_verification(raw_text, target_lang):
+    """Yield SSE events: language, baseline, then evidence + provisional verdict per provider, then final"""
+    src_lang = safe_detect_lang(raw_text)
+    yield sse_event("language", {"language": src_lang})
+
+    text_en = raw_text if src_lang.startswith("en") else translate_text(raw_text, "en")
+    lbl, conf = baseline_ml_label(text_en)
+    yield sse_event("baseline", {"label": lbl, "confidence": conf})
+
+    results_by_provider = {}
+    for provider, results in iter_evidence(build_queries(text_en)):
+        results_by_provider[provider] = results
+        # Send the deduplicated items so counts on the client match what the verdict is based on
+        evidence = refine_evidence(collect_evidence(results_by_provider))
+        items = [e for e in evidence if e.get("type") == provider]
+        yield sse_event("evidence", {"provider": provider, "count": len(items), "items": items,
+                                     "total": len(evidence)})
+        verdict, reason = decide_verdict(text_en, evidence)
+        yield sse_event("verdict", {
+            "verdict": verdict,
+            "analysis": reason,
+            "providers_done": len(results_by_provider),
+            "providers_total": len(EVIDENCE_PROVIDERS),
+        })
+
+    evidence = refine_evidence(collect_evidence(results_by_provider))
+    verdict, reason = decide_verdict(text_en, evidence)
+    if target_lang != "auto":
+        reason = translate_text(reason, target_lang)
+    yield sse_event("final", {
+        "verdict": verdict,
+        "analysis": reason,
+        "evidence": format_evidence_text(evidence, target_lang=target_lang),
+        "original_text": raw_text,
+    })
+
+@app.route("/api/verify/stream", methods=["GET", "POST"])
+def verify_stream():
+    data = request.values
+    raw_text = data.get("news_text", "") or ""
+    target_lang = data.get("target_lang", "auto")
+    uploaded_file = request.files.get('file_upload')
+
+    # Extraction happens before streaming starts so the upload is still available
+    if uploaded_file and uploaded_file.filename:
+        extracted_text = process_uploaded_file(uploaded_file)
+        if extracted_text and not extracted_text.startswith("Error"):
+            raw_text = extracted_text if not raw_text.strip() else raw_text + "\n\n[Extracted from file]:\n" + extracted_text
+
+    if not raw_text.strip():
+        return jsonify({"error": "Please enter some text or upload a file."}), 400
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(stream_verification(raw_text, target_lang)),
+                    mimetype="text/event-stream", headers=headers)
+
+# Labelled feedback for the online model (consumed by `python online_model.py --feedback`).
+# Only trusted moderators holding FEEDBACK_TOKEN may post; the route is not exposed to CORS.
+@app.route("/api/feedback", methods=["POST"])
+def feedback():
+    token = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not online_model.FEEDBACK_TOKEN or not hmac.compare_digest(token, online_model.FEEDBACK_TOKEN):
+        return jsonify({"error": "a valid moderator token is required"}), 403
+
+    data = request.get_json(silent=True) or request.form
+    text = data.get("text", "")
+    label = data.get("label") or data.get("verdict", "")
+    if not isinstance(text, str) or len(text) > online_model.MAX_FEEDBACK_CHARS:
+        return jsonify({"error": f"text must be at most {online_model.MAX_FEEDBACK_CHARS} characters"}), 413
+    if online_model.feedback_full():
+        return jsonify({"error": "feedback queue is full until the next training run"}), 503
+    if not isinstance(label, str) or not online_model.record_feedback(text, label):
+        return jsonify({"error": "text and a label of fake/real (or Fact/Misconception) are required"}), 400
+    return jsonify({"status": "recorded"})
+
 if __name__ == "__main__":
     app.run(debug=True)
 
@@ -0,0 +1,281 @@
+# batch_verify.py
+# Offline bulk verification: stream claims from JSONL/CSV through the same pipeline as the web form
+# (detect -> translate -> provider queries -> evidence -> verdict) and append results to a JSONL file.
+#
+#   python batch_verify.py forwards.jsonl results.jsonl --workers 8 --rate newsapi=1 --rate bing=3
+#
+# The output file doubles as the checkpoint: claims whose id is already in it are skipped, so an
+# interrupted run picks up where it stopped without re-querying anything. Providers and translation
+# run in strict mode here: 429s, 5xx and timeouts are retried with backoff, and a provider that still
+# fails is listed in the row's "failed_providers" so its verdict can be told apart from one built on
+# full evidence. --retry-failed re-verifies those rows (the last row for an id wins). A claim whose
+# translation fails is not written at all and is retried by the next run.
+import os
+import sys
+import csv
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+from deep_translator.exceptions import TooManyRequests, RequestError
+
+import app
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """Token bucket shared by all claim workers: at most `rate` calls per second."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+# ----- Input -----
+def claim_id(row, text, id_field):
+    if row.get(id_field) not in (None, ""):
+        return str(row[id_field])
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _json_rows(f):
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            print(f"Skipping malformed line: {line[:80]!r}", file=sys.stderr)
+
+
+def read_claims(path, text_field, id_field):
+    """Yield (id, text) from a .csv file or a JSONL file, one claim at a time."""
+    with open(path, "r", encoding="utf-8", errors="ignore", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = _json_rows(f)
+        for row in rows:
+            if not isinstance(row, dict):
+                print(f"Skipping non-object row: {str(row)[:80]!r}", file=sys.stderr)
+                continue
+            text = row.get(text_field)
+            if text is not None and not isinstance(text, str):
+                print(f"Skipping row with non-string {text_field}: {str(row)[:80]!r}", file=sys.stderr)
+                continue
+            text = (text or "").strip()
+            if text:
+                yield claim_id(row, text, id_field), text
+
+
+def load_done(path, retry_failed=False):
+    """Ids already written to the output file. A torn last line from a crash is ignored.
+
+    With retry_failed, ids whose latest row has failed providers are left out so they run again.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                done[row["id"]] = bool(row.get("failed_providers"))
+            except (ValueError, KeyError, TypeError):
+                continue
+    return {cid for cid, failed in done.items() if not (retry_failed and failed)}
+
+
+def open_output(path):
+    out = open(path, "a+", encoding="utf-8")
+    out.seek(0, os.SEEK_END)
+    if out.tell() > 0:
+        out.seek(out.tell() - 1)
+        if out.read(1) != "\n":
+            out.write("\n")  # finish a line cut off by an interrupted run
+    return out
+
+
+# ----- Pipeline -----
+def _retryable(e):
+    """Rate limits, server errors and network trouble are worth another try; anything else is not."""
+    if isinstance(e, (requests.Timeout, requests.ConnectionError, TooManyRequests, RequestError)):
+        return True
+    response = getattr(e, "response", None)
+    return response is not None and response.status_code in RETRY_STATUSES
+
+
+def _retry_after(e):
+    response = getattr(e, "response", None)
+    try:
+        return float(response.headers.get("Retry-After", 0)) if response is not None else 0
+    except ValueError:
+        return 0  # an HTTP date; fall back to our own backoff
+
+
+def call_with_retry(limiter, retry, fn, *args, **kwargs):
+    """Call fn under the limiter, retrying retryable errors with exponential backoff and jitter."""
+    attempts = max(1, retry.attempts)
+    for attempt in range(attempts):
+        limiter.wait()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt + 1 >= attempts or not _retryable(e):
+                raise
+            delay = retry.backoff * 2 ** attempt * (1 + random.random())
+            time.sleep(max(delay, _retry_after(e)))
+
+
+def verify_claim(cid, raw_text, limiters, retry):
+    src_lang = app.safe_detect_lang(raw_text)
+    text_en = raw_text
+    if not src_lang.startswith("en"):
+        text_en = call_with_retry(limiters["translate"], retry, app.translate_text, raw_text, "en", strict=True)
+
+    failed = {}
+    queries = app.build_queries(text_en)
+    if app.NEWSAPI_AI_KEY:
+        # Resolve concepts here so the lookups go through the newsapi_ai rate limit too
+        concept_uris = []
+        try:
+            for entity in queries["newsapi_ai"]["entities"]:
+                uri = call_with_retry(limiters["newsapi_ai"], retry, app.lookup_newsapi_ai_concept, entity, strict=True)
+                if uri:
+                    concept_uris.append(uri)
+        except Exception as e:
+            failed["newsapi_ai"] = e
+        queries["newsapi_ai"] = dict(queries["newsapi_ai"], concept_uris=concept_uris)
+
+    results = {}
+    for name, fn in app.EVIDENCE_PROVIDERS:
+        if name in failed:
+            continue
+        try:
+            results[name] = call_with_retry(limiters[name], retry, fn, queries[name], strict=True)
+        except Exception as e:
+            failed[name] = e
+    for name, e in failed.items():
+        print(f"[{cid}] {name} failed: {e}", file=sys.stderr)
+    evidence = app.refine_evidence(app.collect_evidence(results))
+    verdict, reason = app.decide_verdict(text_en, evidence)
+
+    return {
+        "id": cid,
+        "language": src_lang,
+        "verdict": verdict,
+        "analysis": reason,
+        "evidence_count": len(evidence),
+        "urls": [e.get("url") for e in evidence if e.get("url")][:10],
+        "failed_providers": sorted(failed),
+        "checked_at": time.time(),
+    }
+
+
+def parse_rates(values, default):
+    rates = {name: default for name, _ in app.EVIDENCE_PROVIDERS}
+    for value in values:
+        name, _, rate = value.partition("=")
+        if name not in rates:
+            raise SystemExit(f"Unknown provider '{name}', expected one of: {', '.join(rates)}")
+        rates[name] = float(rate)
+    return rates
+
+
+def run(args):
+    done = load_done(args.output, args.retry_failed)
+    limiters = {name: RateLimiter(rate) for name, rate in parse_rates(args.rate, args.default_rate).items()}
+    limiters["translate"] = RateLimiter(args.translate_rate)
+    out = open_output(args.output)
+    processed = failed = partial = skipped = 0
+    started = time.time()
+
+    def write(record):
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        os.fsync(out.fileno())
+
+    def collect(finished):
+        nonlocal processed, failed, partial
+        for future in finished:
+            cid = pending.pop(future)
+            try:
+                record = future.result()
+                write(record)
+                processed += 1
+                partial += bool(record["failed_providers"])
+            except Exception as e:
+                # not written, so the claim is retried on the next run
+                failed += 1
+                print(f"[{cid}] failed: {e}", file=sys.stderr)
+        if processed and processed % 100 == 0:
+            rate = processed / (time.time() - started)
+            print(f"{processed} verified ({partial} with failed providers), {skipped} skipped, {failed} failed "
+                  f"({rate:.1f}/s)", file=sys.stderr)
+
+    pending = {}
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for cid, text in read_claims(args.input, args.text_field, args.id_field):
+                if cid in done:
+                    skipped += 1
+                    continue
+                done.add(cid)  # also drops duplicate claims within the input
+                # bounded queue: the input is never loaded into memory all at once
+                if len(pending) >= args.workers * 2:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished)
+                pending[pool.submit(verify_claim, cid, text, limiters, args)] = cid
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+    finally:
+        out.close()
+    print(f"Done: {processed} verified ({partial} with failed providers), {skipped} already done, "
+          f"{failed} failed.", file=sys.stderr)
+    return 1 if failed or partial else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify claims from a JSONL/CSV file in bulk.")
+    parser.add_argument("input", help="claims as .jsonl or .csv")
+    parser.add_argument("output", help="results JSONL (appended to; also the resume checkpoint)")
+    parser.add_argument("--workers", type=int, default=4, help="claims verified concurrently")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--id-field", default="id", help="defaults to a hash of the text when missing")
+    parser.add_argument("--default-rate", type=float, default=2.0, help="calls per second per provider, 0 = unlimited")
+    parser.add_argument("--rate", action="append", default=[], metavar="PROVIDER=N",
+                        help="override calls per second for one provider, e.g. newsapi=0.5")
+    parser.add_argument("--translate-rate", type=float, default=1.0, help="translation calls per second, 0 = unlimited")
+    parser.add_argument("--attempts", type=int, default=4, help="tries per call on 429, 5xx and timeouts")
+    parser.add_argument("--backoff", type=float, default=1.0, help="seconds before the first retry, doubled after each")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="re-verify claims whose last row has failed providers")
+    sys.exit(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
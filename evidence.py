@@ -0,0 +1,174 @@
+# evidence.py
+# Post-processing for aggregate_evidence(): the same article often comes back from NewsAPI,
+# newsdata.io, Google CSE and Bing with slightly different URLs. We canonicalize URLs, drop
+# duplicates, group near-identical titles into stories and cap how much each provider contributes,
+# so decide_verdict counts distinct articles and format_evidence_text has less to chew through.
+import os
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+MAX_PER_PROVIDER = int(os.getenv("EVIDENCE_MAX_PER_PROVIDER", "10"))
+TITLE_SIMILARITY = 0.8  # Jaccard overlap of title words for two items to be the same story
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl",
+    "ref", "ref_src", "ref_url", "cmpid", "ocid", "icid", "ito", "smid", "s_cid",
+    "amp", "amp_js_v", "usqp", "outputtype",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "at_")
+HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+AMP_CACHE_SUFFIX = ".cdn.ampproject.org"
+
+TITLE_STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "to", "for", "and", "or", "is", "are", "was", "with",
+    "by", "at", "as", "from", "after", "over", "says", "said",
+}
+# Trailing " - Times of India", " | Reuters" style suffixes added by some providers
+TITLE_SUFFIX_RE = re.compile(r"\s+[-|–—]\s+[^-|–—]{2,40}$")
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _strip_host(host):
+    host = host.lower().split(":")[0]
+    stripped = True
+    while stripped:
+        stripped = False
+        for prefix in HOST_PREFIXES:
+            if host.startswith(prefix) and host.count(".") > 1:
+                host = host[len(prefix):]
+                stripped = True
+    return host
+
+
+def canonicalize_url(url):
+    """Normalize a URL so tracking, AMP and mobile variants of one article compare equal."""
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    if not parts.netloc:
+        return url
+
+    host = parts.netloc.lower()
+    path = parts.path
+
+    # AMP caches: https://www-example-com.cdn.ampproject.org/c/s/www.example.com/story
+    # and Google's https://www.google.com/amp/s/www.example.com/story
+    if host.endswith(AMP_CACHE_SUFFIX) or (host.endswith("google.com") and path.startswith("/amp/")):
+        inner = re.sub(r"^/(?:amp|c|v|i)(?:/(?:s|c|v|i))*/", "", path)
+        if "/" in inner:
+            host, _, rest = inner.partition("/")
+            path = "/" + rest
+
+    host = _strip_host(host)
+
+    path = re.sub(r"/+", "/", path)
+    path = re.sub(r"(?:/amp|\.amp|/amp\.html)/?$", "", path, flags=re.IGNORECASE)
+    path = re.sub(r"^/amp/", "/", path, flags=re.IGNORECASE)
+    path = path.rstrip("/") or "/"
+
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def title_tokens(title):
+    title = TITLE_SUFFIX_RE.sub("", (title or "").strip())
+    return frozenset(w for w in WORD_RE.findall(title.lower()) if w not in TITLE_STOPWORDS)
+
+
+def _similar(a, b):
+    if not a or not b:
+        return False
+    return len(a & b) / len(a | b) >= TITLE_SIMILARITY
+
+
+def _host(url):
+    try:
+        return urlsplit(url).netloc
+    except ValueError:
+        return ""
+
+
+def _merge(kept, dup):
+    for provider in dup.get("providers", [dup.get("type")]):
+        if provider not in kept["providers"]:
+            kept["providers"].append(provider)
+
+
+def _dedupe_key(e):
+    if not e["canonical_url"]:
+        return None
+    if e.get("type") == "factcheck":
+        return (e["canonical_url"], (e.get("claim") or "").strip().lower())
+    return e["canonical_url"]
+
+
+def refine_evidence(evidence, max_per_provider=MAX_PER_PROVIDER):
+    """Canonicalize, dedupe, cluster into stories and cap per provider.
+
+    Input order is provider priority (see aggregate_evidence), so the first copy of an article wins.
+    "url" is left as the provider returned it (it is the link users see); each returned item gets
+    "canonical_url" (used for matching), "providers" (every provider that returned it) and "story" (cluster id).
+    Fact-check claim reviews are deduped on (url, claim): one review page can rate several claims.
+    """
+    by_url = {}
+    stories = []  # [(tokens, {host: kept_item})]
+    per_provider = {}
+    out = []
+
+    for item in evidence:
+        e = dict(item)
+        e["canonical_url"] = canonicalize_url(e.get("url", ""))
+        e["providers"] = [e.get("type")]
+        key = _dedupe_key(e)
+
+        if key and key in by_url:
+            _merge(by_url[key], e)
+            continue
+
+        # Fact-check claim reviews are kept individually; everything else is clustered by title
+        if e.get("type") != "factcheck":
+            tokens = title_tokens(e.get("title"))
+            host = _host(e["canonical_url"])
+            story_id = None
+            for idx, (story_tokens, hosts) in enumerate(stories):
+                if _similar(tokens, story_tokens):
+                    story_id = idx
+                    break
+            if story_id is None:
+                story_id = len(stories)
+                stories.append((tokens, {}))
+            hosts = stories[story_id][1]
+            if host and host in hosts and e.get("type") not in hosts[host]["providers"]:
+                # Same outlet, same story, different URL, found by another provider:
+                # one article seen through two providers. Two hits from one provider are two articles.
+                _merge(hosts[host], e)
+                continue
+            e["story"] = story_id
+        else:
+            host = None
+
+        provider = e.get("type")
+        if per_provider.get(provider, 0) >= max_per_provider:
+            continue
+        per_provider[provider] = per_provider.get(provider, 0) + 1
+
+        if host:
+            stories[e["story"]][1].setdefault(host, e)
+        if key:
+            by_url[key] = e
+        out.append(e)
+
+    return out
+
+
+def distinct_reports(evidence):
+    """Number of distinct (story, outlet) pairs, so one outlet repeating a story counts once."""
+    return len({(e.get("story", e.get("url")), _host(e.get("canonical_url") or e.get("url", ""))) for e in evidence})
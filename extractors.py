@@ -0,0 +1,309 @@
+# extractors.py
+# One registry for turning uploaded files into text, shared by app.py and secondary.py.
+# The backend is picked from the file's magic bytes, not its extension, and every
+# extraction runs in a child process with its own time, memory, duration and concurrency limits.
+import os
+import time
+import zipfile
+import tempfile
+import threading
+import multiprocessing
+
+try:
+    import resource
+    import fcntl
+except ImportError:  # Windows: no rlimits or flock, the other limits still apply per process
+    resource = fcntl = None
+
+import pytesseract
+from PIL import Image
+import docx2txt
+import PyPDF2
+import speech_recognition as sr
+import moviepy.editor as mp
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+SNIFF_BYTES = 4096
+# Concurrency slots are lock files here so the limit holds across all gunicorn workers
+SLOTS_DIR = os.getenv("EXTRACTOR_SLOTS_DIR", os.path.join(tempfile.gettempdir(), "extractor-slots"))
+SLOT_POLL_SECONDS = 0.2
+
+# fork keeps already-loaded models (e.g. whisper) available in the child without reloading
+_ctx = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+
+
+class ExtractionError(Exception):
+    pass
+
+
+# ----- Content sniffing -----
+def sniff(file_path):
+    """Return one of image/pdf/docx/audio/video/text, or None if the content is not recognised."""
+    with open(file_path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    if not head:
+        return None
+
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(file_path) as z:
+                if "word/document.xml" in z.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            pass
+        return None
+
+    if head.startswith((b"\x89PNG\r\n\x1a\n", b"\xff\xd8\xff", b"GIF87a", b"GIF89a", b"BM",
+                        b"II*\x00", b"MM\x00*")):
+        return "image"
+    if head[:4] == b"RIFF":
+        form = head[8:12]
+        if form == b"WEBP":
+            return "image"
+        if form == b"WAVE":
+            return "audio"
+        if form == b"AVI ":
+            return "video"
+        return None
+
+    if head.startswith((b"fLaC", b"OggS", b"ID3")):
+        return "audio"
+    if len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        return "audio"  # MP3 / AAC (ADTS) frame sync
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        return "audio" if brand in (b"M4A ", b"M4B ", b"M4P ") else "video"
+    if head.startswith((b"\x1a\x45\xdf\xa3", b"FLV")):
+        return "video"
+
+    if b"\x00" not in head:
+        try:
+            head.decode("utf-8")
+            return "text"
+        except UnicodeDecodeError:
+            # could be a multi-byte character cut at the sniff boundary
+            try:
+                head[:-3].decode("utf-8")
+                return "text"
+            except UnicodeDecodeError:
+                return None
+    return None
+
+
+def media_duration(file_path):
+    return float(ffmpeg_parse_infos(file_path).get("duration") or 0)
+
+
+# ----- Default backends -----
+def extract_image(file_path):
+    return pytesseract.image_to_string(Image.open(file_path)).strip()
+
+
+def extract_pdf(file_path):
+    txt = []
+    with open(file_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        for p in reader.pages:
+            page_text = p.extract_text()
+            if page_text:
+                txt.append(page_text)
+    return "\n".join(txt)
+
+
+def extract_docx(file_path):
+    return docx2txt.process(file_path)
+
+
+def extract_plain_text(file_path):
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def extract_audio(file_path):
+    temp_wav = file_path + ".wav"
+    try:
+        audio_clip = mp.AudioFileClip(file_path)
+        audio_clip.write_audiofile(temp_wav, logger=None)
+        audio_clip.close()
+        r = sr.Recognizer()
+        with sr.AudioFile(temp_wav) as source:
+            audio = r.record(source)
+        return r.recognize_google(audio)
+    finally:
+        if os.path.exists(temp_wav):
+            os.remove(temp_wav)
+
+
+def extract_video(file_path):
+    temp_audio = file_path + ".audio.wav"
+    try:
+        video = mp.VideoFileClip(file_path)
+        video.audio.write_audiofile(temp_audio, logger=None)
+        video.close()
+        return extract_audio(temp_audio)
+    finally:
+        if os.path.exists(temp_audio):
+            os.remove(temp_audio)
+
+
+# ----- Registry -----
+class Slots:
+    """At most `size` holders at a time across every process on the host.
+
+    Each slot is a lock file held with flock, so the kernel frees the slot if a worker is killed
+    mid-extraction. Without fcntl the limit falls back to the current process only.
+    """
+
+    def __init__(self, name, size):
+        self.size = size
+        self.paths = [os.path.join(SLOTS_DIR, f"{name}.{i}.lock") for i in range(size)]
+        self.local = threading.BoundedSemaphore(size) if fcntl is None else None
+
+    def acquire(self, timeout=None):
+        """Return a handle to pass to release(), or None if no slot freed up within timeout."""
+        if self.local:
+            return self.local if self.local.acquire(timeout=timeout) else None
+        os.makedirs(SLOTS_DIR, exist_ok=True)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            for path in self.paths:
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    os.close(fd)
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(SLOT_POLL_SECONDS)
+
+    def release(self, handle):
+        if self.local:
+            self.local.release()
+        else:
+            os.close(handle)  # closing the last descriptor drops the flock
+
+
+class Extractor:
+    """A backend plus the limits it runs under. A limit of None means unlimited."""
+
+    def __init__(self, kind, func, timeout=None, max_concurrency=None, max_memory_mb=None,
+                 max_duration=None, isolated=True):
+        self.kind = kind
+        self.func = func
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.max_duration = max_duration
+        self.max_concurrency = max_concurrency
+        self.isolated = isolated
+        self.slots = Slots(kind, max_concurrency) if max_concurrency else None
+
+
+def _vm_size():
+    """Current address space of this process in bytes (Linux), 0 if unknown."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def _run_child(kind, func, max_duration, max_memory_mb, file_path, conn):
+    try:
+        if resource and max_memory_mb:
+            # a forked child starts with the parent's whole address space (models, libraries);
+            # the budget is what the extraction may add on top of that
+            limit = _vm_size() + max_memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        conn.send(("ok", _run(kind, func, max_duration, file_path)))
+    except BaseException as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _run(kind, func, max_duration, file_path):
+    if max_duration:
+        duration = media_duration(file_path)
+        if duration > max_duration:
+            raise ExtractionError(f"{kind} is {duration:.0f}s long, limit is {max_duration:.0f}s")
+    return func(file_path) or ""
+
+
+class ExtractorRegistry:
+    def __init__(self):
+        self.extractors = {}
+
+    def register(self, kind, func, **limits):
+        """Add or replace the backend for a sniffed kind. Limits not given are kept from the old entry."""
+        old = self.extractors.get(kind)
+        if old:
+            defaults = {
+                "timeout": old.timeout,
+                "max_concurrency": old.max_concurrency,
+                "max_memory_mb": old.max_memory_mb,
+                "max_duration": old.max_duration,
+                "isolated": old.isolated,
+            }
+            defaults.update(limits)
+            limits = defaults
+        self.extractors[kind] = Extractor(kind, func, **limits)
+
+    def extract(self, file_path):
+        """Return the text in file_path. Raises ExtractionError on unsupported content, limits or backend failures."""
+        kind = sniff(file_path)
+        extractor = self.extractors.get(kind)
+        if not extractor:
+            raise ExtractionError(f"Unsupported file content{' (' + kind + ')' if kind else ''}")
+
+        slot = extractor.slots.acquire(timeout=extractor.timeout) if extractor.slots else None
+        if extractor.slots and slot is None:
+            raise ExtractionError(f"Too many {kind} files being processed, try again later")
+        try:
+            if not extractor.isolated:
+                return _run(kind, extractor.func, extractor.max_duration, file_path)
+            return self._run_isolated(extractor, file_path)
+        finally:
+            if slot is not None:
+                extractor.slots.release(slot)
+
+    def _run_isolated(self, extractor, file_path):
+        parent_conn, child_conn = _ctx.Pipe(duplex=False)
+        args = (extractor.kind, extractor.func, extractor.max_duration, extractor.max_memory_mb, file_path, child_conn)
+        proc = _ctx.Process(target=_run_child, args=args, daemon=True)
+        proc.start()
+        child_conn.close()
+        try:
+            if not parent_conn.poll(extractor.timeout):
+                raise ExtractionError(f"{extractor.kind} extraction timed out after {extractor.timeout}s")
+            try:
+                status, payload = parent_conn.recv()
+            except EOFError:
+                # child died without reporting, most likely killed for exceeding its memory limit
+                raise ExtractionError(f"{extractor.kind} extraction crashed")
+        finally:
+            parent_conn.close()
+            if proc.is_alive():
+                proc.kill()
+            proc.join()
+        if status != "ok":
+            raise ExtractionError(payload)
+        return payload
+
+
+def default_registry():
+    registry = ExtractorRegistry()
+    registry.register("text", extract_plain_text, isolated=False)
+    registry.register("image", extract_image, timeout=30, max_concurrency=4, max_memory_mb=1024)
+    registry.register("pdf", extract_pdf, timeout=60, max_concurrency=4, max_memory_mb=1024)
+    registry.register("docx", extract_docx, timeout=30, max_concurrency=4, max_memory_mb=512)
+    # The free Google Web Speech endpoint used by extract_audio rejects clips much longer than a minute,
+    # so there is no point converting anything longer. Backends without that cap register their own limit.
+    registry.register("audio", extract_audio, timeout=60, max_concurrency=2, max_memory_mb=2048, max_duration=60)
+    registry.register("video", extract_video, timeout=90, max_concurrency=1, max_memory_mb=2048, max_duration=60)
+    return registry
@@ -0,0 +1,24 @@
+# gunicorn.conf.py
+# Picked up automatically by `gunicorn app:app` (see Procfile).
+#
+# MODEL_HOSTING=preload (default): the app module - and with it the sklearn pipelines - is imported
+# once in the master before workers are forked, so every worker shares the same physical pages
+# copy-on-write instead of holding its own copy.
+# MODEL_HOSTING=per_worker: old behaviour, each worker imports the app (and loads models) itself.
+# Use bench_memory.py to compare RSS/PSS per worker between the two.
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+preload_app = os.getenv("MODEL_HOSTING", "preload") == "preload"
+
+
+def when_ready(server):
+    if preload_app:
+        # Move everything loaded so far into the permanent generation. Otherwise the first
+        # collection in each worker writes to GC headers of the shared objects and un-shares
+        # the pages they live on.
+        gc.freeze()
+
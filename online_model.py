@@ -0,0 +1,265 @@
+# online_model.py
+# Streaming fake/real classifier: HashingVectorizer + SGDClassifier updated with partial_fit.
+# Memory stays fixed (the hashed feature space never grows) no matter how much feedback we train on.
+import os
+import glob
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+import joblib
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+ONLINE_MODEL_PATH = os.getenv("ONLINE_MODEL_PATH", "models/online_model.joblib")
+FEEDBACK_PATH = os.getenv("FEEDBACK_PATH", "feedback/labels.jsonl")
+# /api/feedback is refused unless FEEDBACK_TOKEN is set and sent by the caller
+FEEDBACK_TOKEN = os.getenv("FEEDBACK_TOKEN", "")
+MAX_FEEDBACK_CHARS = int(os.getenv("FEEDBACK_MAX_CHARS", "5000"))
+MAX_FEEDBACK_BYTES = int(os.getenv("FEEDBACK_MAX_MB", "50")) * 1024 * 1024  # until the next training run
+N_FEATURES = 2 ** 18  # ~2MB of float64 weights, regardless of corpus size
+# Until this much labelled data (with both classes) has been seen, baseline_ml_label keeps using the seed model
+MIN_SAMPLES = int(os.getenv("ONLINE_MODEL_MIN_SAMPLES", "50"))
+MIN_SAMPLES_PER_CLASS = int(os.getenv("ONLINE_MODEL_MIN_PER_CLASS", "10"))
+SEED_EPOCHS = 5
+
+CLASSES = ["fake", "real"]
+
+# Seed corpus, shared with app.py's TF-IDF baseline. Every new online model starts from it so a
+# handful of one-sided feedback can't push it to a single class.
+fake_samples = [
+    "Free 5000 rupees from government to all citizens, click here",
+    "Breaking: actor died due to vaccine within hours share now",
+    "WhatsApp will charge 5 rupees per message tomorrow forward to 10 people",
+    "Modi giving free laptops to students register now",
+    "NASA confirms sun rose from west today shocking"
+]
+real_samples = [
+    "Government announces scholarship program for engineering students",
+    "ISRO successfully launches PSLV mission from Sriharikota",
+    "New traffic rules notified by Ministry of Road Transport",
+    "University releases exam timetable for the semester",
+    "RBI keeps repo rate unchanged in latest policy"
+]
+
+# Map verdicts produced by decide_verdict (and raw labels) onto classifier classes.
+# "Needs more proof" carries no signal, so it is skipped.
+VERDICT_LABELS = {
+    "fact": "real",
+    "real": "real",
+    "misconception": "fake",
+    "fake": "fake",
+}
+
+_feedback_lock = threading.Lock()
+
+
+def make_vectorizer():
+    # Stateless: nothing is learned, so all processes hash text the same way.
+    return HashingVectorizer(n_features=N_FEATURES, ngram_range=(1, 2), alternate_sign=False, norm="l2")
+
+
+def new_model():
+    model = {
+        "classifier": SGDClassifier(loss="log_loss", alpha=1e-5, random_state=0),
+        "n_samples": 0,  # labelled samples seen, not counting the seed corpus
+        "class_counts": {label: 0 for label in CLASSES},
+        "updated_at": None,
+    }
+    vectorizer = make_vectorizer()
+    seed_x = vectorizer.transform(fake_samples + real_samples)
+    seed_y = ["fake"] * len(fake_samples) + ["real"] * len(real_samples)
+    for _ in range(SEED_EPOCHS):
+        model["classifier"].partial_fit(seed_x, seed_y, classes=CLASSES)
+    return model
+
+
+def is_ready(model):
+    counts = model.get("class_counts") or {}
+    return (model.get("n_samples", 0) >= MIN_SAMPLES
+            and all(counts.get(label, 0) >= MIN_SAMPLES_PER_CLASS for label in CLASSES))
+
+
+def to_label(value):
+    return VERDICT_LABELS.get((value or "").strip().lower())
+
+
+# ----- Training side -----
+def iter_labelled(paths):
+    """Yield (text, label) pairs from JSONL files with "text" and "label"/"verdict" keys."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                text = (row.get("text") or "").strip()
+                label = to_label(row.get("label") or row.get("verdict"))
+                if text and label:
+                    yield text, label
+
+
+def iter_batches(pairs, batch_size):
+    batch = []
+    for pair in pairs:
+        batch.append(pair)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def partial_fit(model, batch, vectorizer=None):
+    vectorizer = vectorizer or make_vectorizer()
+    texts = [t for t, _ in batch]
+    labels = [label for _, label in batch]
+    model["classifier"].partial_fit(vectorizer.transform(texts), labels, classes=CLASSES)
+    model["n_samples"] += len(batch)
+    counts = model.setdefault("class_counts", {label: 0 for label in CLASSES})
+    for label in labels:
+        counts[label] = counts.get(label, 0) + 1
+    model["updated_at"] = time.time()
+    return model
+
+
+def load_model(path=ONLINE_MODEL_PATH):
+    if os.path.exists(path):
+        return joblib.load(path)
+    return new_model()
+
+
+def save_model(model, path=ONLINE_MODEL_PATH):
+    """Write to a temp file in the same folder and rename over the old one, so readers never see half a file."""
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            joblib.dump(model, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def train(paths, batch_size=256, model_path=ONLINE_MODEL_PATH, fresh=False):
+    model = new_model() if fresh else load_model(model_path)
+    vectorizer = make_vectorizer()
+    seen_before = model["n_samples"]
+    for batch in iter_batches(iter_labelled(paths), batch_size):
+        partial_fit(model, batch, vectorizer)
+    if model["n_samples"] > seen_before:
+        save_model(model, model_path)
+    return model
+
+
+def rotate_feedback(path=FEEDBACK_PATH):
+    """Move the live feedback file aside so workers start a new one while we train on the old one."""
+    if not os.path.exists(path):
+        return None
+    rotated = f"{path}.{time.time_ns()}"
+    os.replace(path, rotated)
+    return rotated
+
+
+def pending_feedback(path=FEEDBACK_PATH):
+    """Rotated feedback files not yet trained on, including ones left by a failed run."""
+    return sorted(p for p in glob.glob(glob.escape(path) + ".*") if p.rsplit(".", 1)[-1].isdigit())
+
+
+# ----- Serving side -----
+def feedback_full(path=FEEDBACK_PATH):
+    try:
+        return os.path.getsize(path) >= MAX_FEEDBACK_BYTES
+    except OSError:
+        return False
+
+
+def record_feedback(text, label, path=FEEDBACK_PATH):
+    """Append one labelled example for the next training run. Returns False if the label is not usable."""
+    label = to_label(label)
+    text = (text or "").strip()
+    if not text or not label:
+        return False
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = json.dumps({"text": text, "label": label, "ts": time.time()}, ensure_ascii=False)
+    with _feedback_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    return True
+
+
+class OnlineModel:
+    """Serves the latest saved model and picks up new versions when the file on disk changes."""
+
+    def __init__(self, path=ONLINE_MODEL_PATH):
+        self.path = path
+        self.vectorizer = make_vectorizer()
+        self._model = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    try:
+                        model = joblib.load(self.path)
+                    except Exception as e:
+                        print("Online model reload failed:", e)
+                        return self._model
+                    # Swapping the reference is atomic; requests already running keep the old model.
+                    self._model = model
+                    self._mtime = mtime
+        return self._model
+
+    def predict(self, text):
+        """Return (label, confidence), or None until the model has seen enough data from both classes."""
+        model = self.current()
+        if not model or not is_ready(model):
+            return None
+        clf = model["classifier"]
+        proba = clf.predict_proba(self.vectorizer.transform([text]))[0]
+        best_idx = proba.argmax()
+        return clf.classes_[best_idx], float(proba[best_idx])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the online fake/real classifier from labelled JSONL.")
+    parser.add_argument("corpus", nargs="*", help="JSONL files with text and label/verdict fields")
+    parser.add_argument("--feedback", action="store_true", help=f"also consume {FEEDBACK_PATH}")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--model", default=ONLINE_MODEL_PATH)
+    parser.add_argument("--fresh", action="store_true", help="discard the saved model and start over from the seed corpus")
+    args = parser.parse_args()
+
+    paths = list(args.corpus)
+    feedback_files = []
+    if args.feedback:
+        rotate_feedback()
+        feedback_files = pending_feedback()
+        paths.extend(feedback_files)
+    if not paths:
+        parser.error("nothing to train on")
+
+    model = train(paths, batch_size=args.batch_size, model_path=args.model, fresh=args.fresh)
+    # Only drop feedback once it is in a saved model; after a failure the next run picks it up again
+    for path in feedback_files:
+        os.remove(path)
+    print(f"Online model at {args.model}: {model['n_samples']} samples seen.")
+
+
+if __name__ == "__main__":
+    main()
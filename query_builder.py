@@ -0,0 +1,209 @@
+# query_builder.py
+# Turns a claim into the query each evidence provider actually wants.
+# Keywords and named entities are extracted once per claim; news APIs get a short keyword query,
+# newsapi.ai gets entities to resolve into concepts, and the Fact Check API keeps the full claim.
+import re
+from collections import Counter
+
+MAX_CLAIM_CHARS = 300     # Fact Check API: full claim
+NEWS_QUERY_TERMS = 4      # NewsAPI / newsdata.io AND their terms, so keep it short
+NEWS_QUERY_CHARS = 100    # newsdata.io rejects longer q
+WEB_QUERY_TERMS = 8       # Google CSE / Bing rank rather than filter, so a few more terms help
+
+STOPWORDS = {
+    "a", "about", "above", "after", "again", "against", "all", "also", "am", "an", "and", "any", "are",
+    "as", "at", "be", "because", "been", "before", "being", "below", "between", "both", "but", "by",
+    "can", "could", "did", "do", "does", "doing", "down", "during", "each", "few", "for", "from",
+    "further", "had", "has", "have", "having", "he", "her", "here", "hers", "him", "his", "how", "i",
+    "if", "in", "into", "is", "it", "its", "just", "me", "more", "most", "my", "no", "nor", "not",
+    "now", "of", "off", "on", "once", "only", "or", "other", "our", "ours", "out", "over", "own",
+    "per", "same", "she", "should", "so", "some", "such", "than", "that", "the", "their", "them",
+    "then", "there", "these", "they", "this", "those", "through", "to", "too", "under", "until",
+    "up", "very", "was", "we", "were", "what", "when", "where", "which", "while", "who", "whom",
+    "why", "will", "with", "would", "you", "your", "yours",
+    # forward/chain-message filler that never helps a news search
+    "breaking", "urgent", "share", "forward", "please", "click", "here", "news", "today", "tomorrow",
+    "yesterday", "people", "everyone", "now", "viral", "must", "read", "watch", "says", "said",
+    "new", "latest", "shocking", "confirms", "claims", "reportedly",
+    # dates are too common to narrow a search
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+    "january", "february", "march", "april", "may", "june", "july", "august", "september",
+    "october", "november", "december",
+}
+# Everyday words that start a sentence ("Government announces ...", "Scientists discover ...")
+# without being a name. A sentence-initial word outside this list is kept as an entity ("Modi
+# giving free laptops"), as is any word that appears capitalized again later in the claim.
+COMMON_WORDS = {
+    "government", "govt", "police", "court", "army", "officials", "minister", "experts", "doctors",
+    "scientists", "researchers", "students", "teachers", "farmers", "workers", "citizens", "users",
+    "customers", "parents", "children", "kids", "women", "men", "man", "woman", "boy", "girl", "family",
+    "soldiers", "terrorists", "hackers", "company", "companies", "banks", "bank", "schools", "school",
+    "hospitals", "video", "photo", "image", "message", "post", "alert", "warning", "notice", "report",
+    "reports", "study", "research", "attention", "beware", "dear", "friends", "hello", "kindly", "free",
+    "big", "huge", "massive", "important", "every", "many", "several", "even", "still", "never",
+    "always", "soon", "finally", "officially", "first", "last", "next", "top", "best", "good", "bad",
+    "state", "central", "national", "international", "global", "world", "country", "city", "local",
+    "water", "vaccine", "vaccines", "petrol", "diesel", "prices", "price", "tax", "taxes", "salary",
+    "pension", "loan", "loans", "scheme", "schemes", "rules", "rule", "law", "laws", "ban", "banned",
+    "fake", "true", "false", "official", "app", "apps", "phone", "phones", "mobile", "internet", "online",
+    "social", "media", "election", "elections", "voters", "exam", "exams", "results", "heavy", "rain",
+    "flood", "floods", "earthquake", "fire", "accident", "attack", "death", "dead", "arrested",
+    "launches", "launched", "announces", "announced", "plans", "giving", "gives", "get", "send", "call",
+    "check", "avoid", "drink", "eat", "use", "buy", "pay", "register", "apply", "join", "help", "see",
+    "look", "listen", "remember", "note", "don't", "stop", "save", "win",
+}
+# Lowercase words allowed inside a multi-word entity ("Ministry of Road Transport")
+ENTITY_CONNECTORS = {"of", "for", "and", "de", "the"}
+
+# Initials stay one word ("D.Y.", "U.S."), as does a single initial before a name ("Narendra D. Modi")
+WORD_RE = re.compile(r"(?:[A-Z]\.){2,}|[A-Z]\.(?=\s+[A-Z][a-z])|[A-Za-z][A-Za-z0-9'\-]*|\d[\d,.]*")
+# "." only counts as a sentence end before whitespace and a capital letter; see _sentences
+SENTENCE_END_RE = re.compile(r"[!?:\n]|\.(?=\s+[A-Z])")
+# Titles and abbreviations whose "." does not end the sentence ("Dr. Singh", "Govt. of India")
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "st", "jr", "sr", "gen", "lt", "col", "capt", "sgt",
+                 "hon", "govt", "dept", "no", "vs", "co", "inc", "ltd", "smt", "shri"}
+
+
+def normalize_query(text):
+    text = re.sub(r"\s+", " ", text or "").strip()
+    return text[:MAX_CLAIM_CHARS]
+
+
+def _is_capitalized(word):
+    return word[0].isupper()
+
+
+def _looks_like_name(word):
+    """Acronyms ("ISRO") and camel case ("WhatsApp") are names even where every word is capitalized."""
+    return any(c.isupper() for c in word[1:])
+
+
+def _ends_sentence(before):
+    """Whether a "." after the words in `before` ends a sentence (see SENTENCE_END_RE)."""
+    if not before:
+        return True
+    word = before[-1]
+    if word.lower() in ABBREVIATIONS or "." in word:  # "Dr.", "D.Y."
+        return False
+    # an initial after a name ("Narendra D. Modi"), but not "plan B. Then ..."
+    return not (len(word) == 1 and len(before) > 1 and _is_capitalized(before[-2]))
+
+
+def _sentences(text):
+    """Split at "!", "?", ":" and newlines, and at a "." that is not an initial or abbreviation."""
+    start = 0
+    for m in SENTENCE_END_RE.finditer(text):
+        if m.group() == "." and not _ends_sentence(text[max(start, m.start() - 40):m.start()].split()):
+            continue
+        yield text[start:m.start()]
+        start = m.end()
+    yield text[start:]
+
+
+def extract_entities(text):
+    """Runs of capitalized words and acronyms, e.g. "Election Commission", "ISRO", "Narendra Modi"."""
+    entities = []
+    sentences = [WORD_RE.findall(sentence) for sentence in _sentences(text or "")]
+    # capitalized somewhere other than the start of a sentence, so a name rather than sentence case
+    named = {w for words in sentences for w in words[1:] if _is_capitalized(w)}
+    for words in sentences:
+        run = []
+        run_start = 0
+
+        def flush():
+            # a lone everyday word at the start of a sentence ("Government announces ...") is
+            # just sentence case, not a name
+            if run and run_start == 0 and len(run) == 1 and not _looks_like_name(run[0]) \
+                    and run[0].lower() in COMMON_WORDS and run[0] not in named:
+                return
+            if run:
+                entities.append(" ".join(run))
+
+        for idx, word in enumerate(words):
+            if _is_capitalized(word) and not (idx == 0 and word.lower() in STOPWORDS):
+                if not run:
+                    run_start = idx
+                run.append(word)
+            elif run and word.lower() in ENTITY_CONNECTORS and idx + 1 < len(words) \
+                    and _is_capitalized(words[idx + 1]):
+                run.append(word)
+            else:
+                flush()
+                run = []
+        flush()
+
+    seen = set()
+    out = []
+    for entity in entities:
+        key = entity.lower()
+        if key in STOPWORDS or key in seen or len(entity) < 2:
+            continue
+        seen.add(key)
+        out.append(entity)
+    return out
+
+
+def extract_keywords(text, limit=10):
+    """Content words ranked by frequency, then by first appearance."""
+    words = [w.lower() for w in WORD_RE.findall(text or "")]
+    candidates = [w for w in words if w not in STOPWORDS and (len(w) > 2 or w.isdigit()) and not w.endswith(".")]
+    counts = Counter(candidates)
+    first_seen = {}
+    for idx, w in enumerate(candidates):
+        first_seen.setdefault(w, idx)
+    ranked = sorted(counts, key=lambda w: (-counts[w], first_seen[w]))
+    return ranked[:limit]
+
+
+def _quotable(entity):
+    """Multi-word and not ending in a lone letter: a phrase cut at an initial would match nothing."""
+    return " " in entity and len(entity.split()[-1].rstrip(".")) > 1
+
+
+def _terms(entities, keywords, limit):
+    """Entities first (quoted when a phrase), then keywords not already covered by an entity."""
+    terms = []
+    covered = set()
+    for entity in entities:
+        terms.append(f'"{entity}"' if _quotable(entity) else entity)
+        covered.update(w.lower() for w in entity.split())
+    for kw in keywords:
+        if kw not in covered:
+            terms.append(kw)
+    return terms[:limit]
+
+
+def _join_within(terms, max_chars):
+    out = ""
+    for term in terms:
+        candidate = f"{out} {term}".strip()
+        if len(candidate) > max_chars:
+            break
+        out = candidate
+    return out
+
+
+def analyze_claim(text_en):
+    return {
+        "claim": normalize_query(text_en),
+        "entities": extract_entities(text_en),
+        "keywords": extract_keywords(text_en),
+    }
+
+
+def build_queries(text_en):
+    """Return the query for each provider type used in app.EVIDENCE_PROVIDERS."""
+    info = analyze_claim(text_en)
+    claim, entities, keywords = info["claim"], info["entities"], info["keywords"]
+
+    news_query = _join_within(_terms(entities, keywords, NEWS_QUERY_TERMS), NEWS_QUERY_CHARS) or claim[:NEWS_QUERY_CHARS]
+    web_query = " ".join(_terms(entities, keywords, WEB_QUERY_TERMS)) or claim
+
+    return {
+        "factcheck": claim,
+        "newsapi_ai": {"entities": entities[:3], "keywords": " ".join(keywords[:NEWS_QUERY_TERMS]) or claim},
+        "newsdata_io": news_query,
+        "newsapi": news_query,
+        "google_search": web_query,
+        "bing": web_query,
+    }
@@ -7,10 +7,9 @@ from werkzeug.utils import secure_filename
 # text/image/audio/video processing
 from PIL import Image
 import pytesseract
-import docx2txt
-import PyPDF2
 import whisper
-# from moviepy.editor import VideoFileClip
+from moviepy.editor import VideoFileClip
+import extractors
 
 # simple AI model
 from sklearn.pipeline import Pipeline
@@ -62,52 +61,43 @@ model = Pipeline([
 model.fit(texts, labels)
 print("Tiny AI model trained (demo).")
 
+# ----- Whisper backends for the shared extractor registry -----
+def transcribe_audio(filepath):
+    res = whisper_model.transcribe(filepath)
+    return res.get("text", "")
+
+def transcribe_video(filepath):
+    # Extract audio from video and transcribe, also try OCR from one frame
+    clip = VideoFileClip(filepath)
+    audio_path = filepath + "_audio.wav"
+    frame_path = filepath + "_frame.jpg"
+    try:
+        clip.audio.write_audiofile(audio_path, logger=None)
+        audio_text = transcribe_audio(audio_path)
+        # save one frame (at 1s) and OCR it
+        try:
+            clip.save_frame(frame_path, t=1.0)
+            frame_text = pytesseract.image_to_string(Image.open(frame_path))
+        except Exception:
+            frame_text = ""
+    finally:
+        clip.close()
+        for path in (audio_path, frame_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return audio_text + "\n" + frame_text
+
+# Whisper has no length cap, so allow up to 10 minutes of media; on CPU that can take several minutes,
+# hence the long timeouts (GUNICORN_TIMEOUT must be raised above them when serving this app).
+# Whisper/torch reserve far more address space than they use, so no RLIMIT_AS for these.
+extractor_registry = extractors.default_registry()
+extractor_registry.register("audio", transcribe_audio, timeout=600, max_memory_mb=None, max_duration=600)
+extractor_registry.register("video", transcribe_video, timeout=720, max_memory_mb=None, max_duration=600)
+
 # ----- Helper: extract text from uploaded file -----
 def extract_text_from_file(filepath):
-    ext = os.path.splitext(filepath)[1].lower()
     try:
-        if ext in [".txt", ".text"]:
-            with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
-                return f.read()
-        elif ext == ".pdf":
-            txt = []
-            with open(filepath, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                for p in reader.pages:
-                    page_text = p.extract_text()
-                    if page_text:
-                        txt.append(page_text)
-            return "\n".join(txt)
-        elif ext in [".docx"]:
-            return docx2txt.process(filepath)
-        elif ext in [".png", ".jpg", ".jpeg", ".bmp", ".tiff"]:
-            img = Image.open(filepath)
-            text = pytesseract.image_to_string(img)
-            return text
-        elif ext in [".mp3", ".wav", ".m4a", ".ogg"]:
-            # use whisper for speech-to-text
-            res = whisper_model.transcribe(filepath)
-            return res.get("text", "")
-        elif ext in [".mp4", ".mov", ".mkv", ".avi"]:
-            # Extract audio from video and transcribe, also try OCR from one frame
-            clip = VideoFileClip(filepath)
-            audio_path = filepath + "_audio.wav"
-            # write audio
-            clip.audio.write_audiofile(audio_path, logger=None)
-            res = whisper_model.transcribe(audio_path)
-            audio_text = res.get("text", "")
-            # save one frame (at 1s) and OCR it
-            frame_path = filepath + "_frame.jpg"
-            try:
-                clip.save_frame(frame_path, t=1.0)
-                frame_text = pytesseract.image_to_string(Image.open(frame_path))
-            except Exception:
-                frame_text = ""
-            clip.close()
-            # combine
-            return audio_text + "\n" + frame_text
-        else:
-            return ""  # unknown extension
+        return extractor_registry.extract(filepath)
     except Exception as e:
         print("Error extracting:", e)
         return ""
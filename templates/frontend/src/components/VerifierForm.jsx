@@ -17,7 +17,7 @@ export default function VerifierForm() {
     if (file) formData.append("file_upload", file);
 
     try {
-      const res = await fetch("http://localhost:5000/api/verify", {
+      const res = await fetch("http://localhost:5000/api/verify/stream", {
         method: "POST",
         body: formData,
         mode: "cors", // ✅ allow CORS
@@ -28,8 +28,40 @@ export default function VerifierForm() {
         throw new Error(errData.error || "Server error");
       }
 
-      const data = await res.json();
-      setResult(data);
+      // Server-Sent Events: render each event as it arrives
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let current = {};
+      setResult(current);
+
+      const handleEvent = (name, data) => {
+        if (name === "language") current = { ...current, language: data.language };
+        else if (name === "baseline") current = { ...current, baseline: data };
+        else if (name === "evidence")
+          current = { ...current, sources: { ...current.sources, [data.provider]: data.count } };
+        else if (name === "verdict")
+          current = { ...current, verdict: data.verdict, analysis: data.analysis, progress: data };
+        else if (name === "final") current = { ...current, ...data, done: true };
+        setResult(current);
+      };
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const chunks = buffer.split("\n\n");
+        buffer = chunks.pop();
+        for (const chunk of chunks) {
+          let name = "message";
+          let data = "";
+          for (const line of chunk.split("\n")) {
+            if (line.startsWith("event: ")) name = line.slice(7);
+            else if (line.startsWith("data: ")) data += line.slice(6);
+          }
+          if (data) handleEvent(name, JSON.parse(data));
+        }
+      }
     } catch (err) {
       console.error("Error:", err);
       setResult({ error: err.message || "Something went wrong" });
@@ -93,8 +125,19 @@ export default function VerifierForm() {
             <p className="text-red-600">{result.error}</p>
           ) : (
             <>
+              {result.baseline && (
+                <p className="text-sm text-gray-500">
+                  🌐 Language: {result.language} · 🤖 AI baseline: {result.baseline.label} (
+                  {Math.round(result.baseline.confidence * 100)}%)
+                </p>
+              )}
               <h2 className="font-bold text-lg">
-                🎯 Verdict: {result.verdict}
+                🎯 Verdict: {result.verdict || "Checking..."}
+                {result.progress && !result.done && (
+                  <span className="ml-2 text-sm font-normal text-gray-500">
+                    (provisional, {result.progress.providers_done}/{result.progress.providers_total} sources checked)
+                  </span>
+                )}
               </h2>
               <p className="mt-2">{result.analysis}</p>
               <p className="mt-2 text-gray-600">{result.evidence}</p>
@@ -0,0 +1,91 @@
+# verdict_rules.py
+# Keyword rules used by decide_verdict, loaded from verdict_rules.json.
+# Every pattern of every category is compiled into one trie-shaped regex, so a text is scanned
+# once no matter how many patterns there are, and matches respect word boundaries
+# ("untrue" is not "true"). When matches overlap, the longest wins ("not true" hides "true").
+# A pattern may name another category in angle brackets: "not <rating_true>" stands for "not " plus
+# each rating_true pattern, so negations stay in step with the list they negate.
+import os
+import re
+import json
+
+VERDICT_RULES_PATH = os.getenv("VERDICT_RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "verdict_rules.json"))
+
+
+REFERENCE_RE = re.compile(r"<(\w+)>")
+
+
+def _normalize(pattern):
+    return " ".join(pattern.lower().split())
+
+
+def _expand(pattern, categories):
+    """Replace a <category> reference with each of that category's own patterns."""
+    m = REFERENCE_RE.search(pattern)
+    if not m:
+        return [pattern]
+    if m.group(1) not in categories:
+        raise ValueError(f"Unknown category <{m.group(1)}> in rule pattern '{pattern}'")
+    return [pattern[:m.start()] + sub + pattern[m.end():]
+            for sub in categories[m.group(1)] if not REFERENCE_RE.search(sub)]
+
+
+def _trie_regex(patterns):
+    """Regex for a set of lowercase patterns, shaped like their prefix trie (longest match first)."""
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for ch in pattern:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node):
+        terminal = "" in node
+        branches = [(r"\s+" if ch == " " else re.escape(ch)) + emit(child)
+                    for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+class RuleEngine:
+    def __init__(self, categories):
+        self.categories = {}
+        for category, patterns in categories.items():
+            for pattern in patterns:
+                for expanded in _expand(pattern, categories):
+                    key = _normalize(expanded)
+                    if key:
+                        self.categories.setdefault(key, set()).add(category)
+        if self.categories:
+            # zero-width lookahead so matches starting inside an earlier match are still found
+            trie = _trie_regex(self.categories)
+            self.regex = re.compile(r"(?<!\w)(?=(" + trie + r")(?!\w))")
+        else:
+            self.regex = None
+
+    def scan(self, text):
+        """Return {category: [matched patterns]} for everything found in text."""
+        hits = {}
+        if not self.regex or not text:
+            return hits
+        max_end = -1
+        for m in self.regex.finditer(text.lower()):
+            end = m.end(1)
+            if end <= max_end:
+                continue  # inside a longer match
+            max_end = end
+            phrase = _normalize(m.group(1))
+            for category in self.categories.get(phrase, ()):
+                hits.setdefault(category, []).append(phrase)
+        return hits
+
+
+def load_rules(path=VERDICT_RULES_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return RuleEngine(json.load(f))